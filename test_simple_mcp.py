@@ -4,162 +4,12 @@ Test script for the Word MCP server.
 """
 
 import os
-import json
-from typing import Optional
-from docx import Document
-
-def ensure_docx_extension(filename: str) -> str:
-    """Ensure filename has .docx extension."""
-    if not filename.endswith('.docx'):
-        return f"{filename}.docx"
-    return filename
-
-def check_file_exists(filename: str) -> bool:
-    """Check if file exists."""
-    return os.path.exists(filename)
-
-def create_document(filename: str, title: Optional[str] = None, author: Optional[str] = None) -> str:
-    """Create a new Word document."""
-    filename = ensure_docx_extension(filename)
-    
-    try:
-        doc = Document()
-        
-        # Set metadata if provided
-        if title:
-            doc.core_properties.title = title
-        if author:
-            doc.core_properties.author = author
-        
-        doc.save(filename)
-        return f"Document '{filename}' created successfully"
-    except Exception as e:
-        return f"Error creating document: {str(e)}"
-
-def write_text(filename: str, text: str, append: bool = True) -> str:
-    """Write text to a Word document."""
-    filename = ensure_docx_extension(filename)
-    
-    try:
-        if append and check_file_exists(filename):
-            # Append to existing document
-            doc = Document(filename)
-        else:
-            # Create new document or replace existing
-            doc = Document()
-        
-        # Add text as paragraph
-        doc.add_paragraph(text)
-        doc.save(filename)
-        
-        action = "appended to" if append and check_file_exists(filename) else "written to"
-        return f"Text {action} '{filename}' successfully"
-    except Exception as e:
-        return f"Error writing to document: {str(e)}"
-
-def add_heading(filename: str, text: str, level: int = 1) -> str:
-    """Add a heading to a Word document."""
-    filename = ensure_docx_extension(filename)
-    
-    # Validate heading level
-    if level < 1 or level > 6:
-        return "Error: Heading level must be between 1 and 6"
-    
-    try:
-        if check_file_exists(filename):
-            doc = Document(filename)
-        else:
-            doc = Document()
-        
-        doc.add_heading(text, level=level)
-        doc.save(filename)
-        
-        return f"Heading '{text}' (level {level}) added to '{filename}'"
-    except Exception as e:
-        return f"Error adding heading: {str(e)}"
-
-def read_document(filename: str) -> str:
-    """Read all text content from a Word document."""
-    filename = ensure_docx_extension(filename)
-    
-    if not check_file_exists(filename):
-        return f"Error: Document '{filename}' does not exist"
-    
-    try:
-        doc = Document(filename)
-        text_content = []
-        
-        for paragraph in doc.paragraphs:
-            if paragraph.text.strip():  # Only add non-empty paragraphs
-                text_content.append(paragraph.text)
-        
-        return "\n".join(text_content)
-    except Exception as e:
-        return f"Error reading document: {str(e)}"
 
-def get_document_info(filename: str) -> str:
-    """Get basic information about a Word document."""
-    filename = ensure_docx_extension(filename)
-    
-    if not check_file_exists(filename):
-        return f"Error: Document '{filename}' does not exist"
-    
-    try:
-        doc = Document(filename)
-        
-        info = {
-            "filename": filename,
-            "title": doc.core_properties.title or "Untitled",
-            "author": doc.core_properties.author or "Unknown",
-            "created": str(doc.core_properties.created) if doc.core_properties.created else "Unknown",
-            "modified": str(doc.core_properties.modified) if doc.core_properties.modified else "Unknown",
-            "paragraph_count": len(doc.paragraphs),
-            "table_count": len(doc.tables),
-            "file_size_kb": round(os.path.getsize(filename) / 1024, 2)
-        }
-        
-        return json.dumps(info, indent=2)
-    except Exception as e:
-        return f"Error getting document info: {str(e)}"
+from docx import Document
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
 
-def replace_text(filename: str, find_text: str, replace_text: str) -> str:
-    """Find and replace text in a Word document."""
-    filename = ensure_docx_extension(filename)
-    
-    if not check_file_exists(filename):
-        return f"Error: Document '{filename}' does not exist"
-    
-    try:
-        doc = Document(filename)
-        replacements = 0
-        
-        # Replace in paragraphs
-        for paragraph in doc.paragraphs:
-            if find_text in paragraph.text:
-                # Replace in runs to preserve formatting
-                for run in paragraph.runs:
-                    if find_text in run.text:
-                        run.text = run.text.replace(find_text, replace_text)
-                        replacements += run.text.count(replace_text)
-        
-        # Replace in tables
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    for paragraph in cell.paragraphs:
-                        if find_text in paragraph.text:
-                            for run in paragraph.runs:
-                                if find_text in run.text:
-                                    run.text = run.text.replace(find_text, replace_text)
-                                    replacements += run.text.count(replace_text)
-        
-        if replacements > 0:
-            doc.save(filename)
-            return f"Replaced {replacements} occurrence(s) of '{find_text}' with '{replace_text}'"
-        else:
-            return f"No occurrences of '{find_text}' found"
-    except Exception as e:
-        return f"Error replacing text: {str(e)}"
+from word_ops import *
 
 def main():
     """Test the simplified Word MCP functionality."""
@@ -213,6 +63,52 @@ def main():
     content = read_document(test_file)
     print(f"   Content:\n   {content.replace(chr(10), chr(10) + '   ')}")
     
+    # Test 9: Bulk edit
+    print("\n9. Applying several edits with bulk_edit:")
+    result = bulk_edit(test_file, [
+        {"type": "add_heading", "text": "Section 1.2", "level": 2},
+        {"type": "add_paragraph", "text": "This paragraph was added by a bulk edit."},
+        {"type": "replace", "find": "bulk edit", "replace": "batch of edits"},
+    ])
+    print(f"   {result}")
+    
+    # Test 10: Bulk edit with a malformed action
+    print("\n10. Bulk edit with a malformed action:")
+    result = bulk_edit(test_file, [
+        {"type": ["add_paragraph"]},
+        {"type": "add_paragraph", "text": "Valid actions still run."},
+    ])
+    print(f"   {result}")
+    
+    # Test 11: Read document after bulk edits
+    print("\n11. Reading document after bulk edits:")
+    content = read_document(test_file)
+    print(f"   Content:\n   {content.replace(chr(10), chr(10) + '   ')}")
+    
+    # Test 12: Replace several texts at once
+    print("\n12. Testing replacement of several texts:")
+    result = replace_text_many(test_file, {"Section": "Part", "sample": "example", "": "ignored"})
+    print(f"   {result}")
+    content = read_document(test_file)
+    print(f"   Content:\n   {content.replace(chr(10), chr(10) + '   ')}")
+    
+    # Test 13: Append to a document with a tracked section change
+    print("\n13. Appending to a document with a tracked section change:")
+    tracked_file = "test_tracked_doc.docx"
+    doc = Document()
+    doc.add_paragraph("Existing paragraph.")
+    doc.sections[0]._sectPr.append(parse_xml(
+        f'<w:sectPrChange {nsdecls("w")} w:id="1" w:author="Test Author"><w:sectPr/></w:sectPrChange>'
+    ))
+    doc.save(tracked_file)
+    result = write_text(tracked_file, "Appended paragraph.")
+    print(f"   {result}")
+    content = read_document(tracked_file)
+    print(f"   Content:\n   {content.replace(chr(10), chr(10) + '   ')}")
+    paragraphs = [p.text for p in Document(tracked_file).paragraphs]
+    assert paragraphs == ["Existing paragraph.", "Appended paragraph."], paragraphs
+    os.remove(tracked_file)
+    
     print("\n" + "=" * 50)
     print("All tests completed successfully!")
     print(f"Test document '{test_file}' created and can be opened in Word.")
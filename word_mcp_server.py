@@ -4,30 +4,19 @@ Simplified Word Document MCP Server using FastMCP.
 Provides only essential Read and Write operations for Word documents.
 """
 
-import os
-import json
-import subprocess
-from typing import Optional, List
-from docx import Document
+import asyncio
+from typing import Optional, List, Dict
 from fastmcp import FastMCP
 
+import word_ops
+
 # Initialize FastMCP server
 mcp = FastMCP("Simple Word Document Server")
 
-def ensure_docx_extension(filename: str) -> str:
-    """Ensure filename has .docx extension."""
-    if not filename.endswith('.docx'):
-        return f"{filename}.docx"
-    return filename
-
-def check_file_exists(filename: str) -> bool:
-    """Check if file exists."""
-    return os.path.exists(filename)
-
 # READ OPERATIONS
 
 @mcp.tool()
-def read_document(filename: str) -> str:
+async def read_document(filename: str) -> str:
     """Read all text content from a Word document.
     
     Args:
@@ -36,25 +25,10 @@ def read_document(filename: str) -> str:
     Returns:
         String containing all text from the document
     """
-    filename = ensure_docx_extension(filename)
-    
-    if not check_file_exists(filename):
-        return f"Error: Document '{filename}' does not exist"
-    
-    try:
-        doc = Document(filename)
-        text_content = []
-        
-        for paragraph in doc.paragraphs:
-            if paragraph.text.strip():  # Only add non-empty paragraphs
-                text_content.append(paragraph.text)
-        
-        return "\n".join(text_content)
-    except Exception as e:
-        return f"Error reading document: {str(e)}"
+    return await asyncio.to_thread(word_ops.read_document, filename)
 
 @mcp.tool()
-def get_document_info(filename: str) -> str:
+async def get_document_info(filename: str) -> str:
     """Get basic information about a Word document.
     
     Args:
@@ -63,31 +37,10 @@ def get_document_info(filename: str) -> str:
     Returns:
         JSON string with document metadata
     """
-    filename = ensure_docx_extension(filename)
-    
-    if not check_file_exists(filename):
-        return f"Error: Document '{filename}' does not exist"
-    
-    try:
-        doc = Document(filename)
-        
-        info = {
-            "filename": filename,
-            "title": doc.core_properties.title or "Untitled",
-            "author": doc.core_properties.author or "Unknown",
-            "created": str(doc.core_properties.created) if doc.core_properties.created else "Unknown",
-            "modified": str(doc.core_properties.modified) if doc.core_properties.modified else "Unknown",
-            "paragraph_count": len(doc.paragraphs),
-            "table_count": len(doc.tables),
-            "file_size_kb": round(os.path.getsize(filename) / 1024, 2)
-        }
-        
-        return json.dumps(info, indent=2)
-    except Exception as e:
-        return f"Error getting document info: {str(e)}"
+    return await asyncio.to_thread(word_ops.get_document_info, filename)
 
 @mcp.tool()
-def list_documents(directory: str = ".") -> str:
+async def list_documents(directory: str = ".") -> str:
     """List all Word documents in a directory.
     
     Args:
@@ -96,27 +49,10 @@ def list_documents(directory: str = ".") -> str:
     Returns:
         List of .docx files found
     """
-    try:
-        if not os.path.exists(directory):
-            return f"Error: Directory '{directory}' does not exist"
-        
-        docx_files = [f for f in os.listdir(directory) if f.endswith('.docx')]
-        
-        if not docx_files:
-            return f"No Word documents found in '{directory}'"
-        
-        result = f"Found {len(docx_files)} Word documents in '{directory}':\n"
-        for file in sorted(docx_files):
-            file_path = os.path.join(directory, file)
-            size_kb = round(os.path.getsize(file_path) / 1024, 2)
-            result += f"  • {file} ({size_kb} KB)\n"
-        
-        return result.strip()
-    except Exception as e:
-        return f"Error listing documents: {str(e)}"
+    return await asyncio.to_thread(word_ops.list_documents, directory)
 
 @mcp.tool()
-def copy_document(source_filename: str, target_filename: str) -> str:
+async def copy_document(source_filename: str, target_filename: str) -> str:
     """Copy a Word document to create a new version while preserving all formatting.
     
     Args:
@@ -126,30 +62,12 @@ def copy_document(source_filename: str, target_filename: str) -> str:
     Returns:
         Success or error message
     """
-    source_filename = ensure_docx_extension(source_filename)
-    target_filename = ensure_docx_extension(target_filename)
-    
-    if not check_file_exists(source_filename):
-        return f"Error: Source document '{source_filename}' does not exist"
-    
-    if check_file_exists(target_filename):
-        return f"Error: Target document '{target_filename}' already exists"
-    
-    try:
-        # Load the source document
-        source_doc = Document(source_filename)
-        
-        # Save it with the new filename (this preserves all formatting, styles, etc.)
-        source_doc.save(target_filename)
-        
-        return f"Document copied successfully from '{source_filename}' to '{target_filename}'"
-    except Exception as e:
-        return f"Error copying document: {str(e)}"
+    return await asyncio.to_thread(word_ops.copy_document, source_filename, target_filename)
 
 # WRITE OPERATIONS
 
 @mcp.tool()
-def create_document(filename: str, title: Optional[str] = None, author: Optional[str] = None) -> str:
+async def create_document(filename: str, title: Optional[str] = None, author: Optional[str] = None) -> str:
     """Create a new Word document.
     
     Args:
@@ -160,24 +78,10 @@ def create_document(filename: str, title: Optional[str] = None, author: Optional
     Returns:
         Success or error message
     """
-    filename = ensure_docx_extension(filename)
-    
-    try:
-        doc = Document()
-        
-        # Set metadata if provided
-        if title:
-            doc.core_properties.title = title
-        if author:
-            doc.core_properties.author = author
-        
-        doc.save(filename)
-        return f"Document '{filename}' created successfully"
-    except Exception as e:
-        return f"Error creating document: {str(e)}"
+    return await asyncio.to_thread(word_ops.create_document, filename, title, author)
 
 @mcp.tool()
-def write_text(filename: str, text: str, append: bool = True) -> str:
+async def write_text(filename: str, text: str, append: bool = True) -> str:
     """Write text to a Word document.
     
     Args:
@@ -188,27 +92,10 @@ def write_text(filename: str, text: str, append: bool = True) -> str:
     Returns:
         Success or error message
     """
-    filename = ensure_docx_extension(filename)
-    
-    try:
-        if append and check_file_exists(filename):
-            # Append to existing document
-            doc = Document(filename)
-        else:
-            # Create new document or replace existing
-            doc = Document()
-        
-        # Add text as paragraph
-        doc.add_paragraph(text)
-        doc.save(filename)
-        
-        action = "appended to" if append and check_file_exists(filename) else "written to"
-        return f"Text {action} '{filename}' successfully"
-    except Exception as e:
-        return f"Error writing to document: {str(e)}"
+    return await asyncio.to_thread(word_ops.write_text, filename, text, append)
 
 @mcp.tool()
-def add_heading(filename: str, text: str, level: int = 1) -> str:
+async def add_heading(filename: str, text: str, level: int = 1) -> str:
     """Add a heading to a Word document.
     
     Args:
@@ -219,27 +106,10 @@ def add_heading(filename: str, text: str, level: int = 1) -> str:
     Returns:
         Success or error message
     """
-    filename = ensure_docx_extension(filename)
-    
-    # Validate heading level
-    if level < 1 or level > 6:
-        return "Error: Heading level must be between 1 and 6"
-    
-    try:
-        if check_file_exists(filename):
-            doc = Document(filename)
-        else:
-            doc = Document()
-        
-        doc.add_heading(text, level=level)
-        doc.save(filename)
-        
-        return f"Heading '{text}' (level {level}) added to '{filename}'"
-    except Exception as e:
-        return f"Error adding heading: {str(e)}"
+    return await asyncio.to_thread(word_ops.add_heading, filename, text, level)
 
 @mcp.tool()
-def replace_text(filename: str, find_text: str, replace_text: str) -> str:
+async def replace_text(filename: str, find_text: str, replace_text: str) -> str:
     """Find and replace text in a Word document.
     
     Args:
@@ -250,45 +120,43 @@ def replace_text(filename: str, find_text: str, replace_text: str) -> str:
     Returns:
         Number of replacements made or error message
     """
-    filename = ensure_docx_extension(filename)
+    return await asyncio.to_thread(word_ops.replace_text, filename, find_text, replace_text)
+
+@mcp.tool()
+async def replace_text_many(filename: str, mapping: Dict[str, str]) -> str:
+    """Find and replace several texts in a Word document in a single pass.
     
-    if not check_file_exists(filename):
-        return f"Error: Document '{filename}' does not exist"
+    Useful for filling templates, e.g. {"{{name}}": "Ada", "{{date}}": "today"}.
+    Where keys overlap, the leftmost and then longest match wins.
     
-    try:
-        doc = Document(filename)
-        replacements = 0
-        
-        # Replace in paragraphs
-        for paragraph in doc.paragraphs:
-            if find_text in paragraph.text:
-                # Replace in runs to preserve formatting
-                for run in paragraph.runs:
-                    if find_text in run.text:
-                        run.text = run.text.replace(find_text, replace_text)
-                        replacements += run.text.count(replace_text)
-        
-        # Replace in tables
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    for paragraph in cell.paragraphs:
-                        if find_text in paragraph.text:
-                            for run in paragraph.runs:
-                                if find_text in run.text:
-                                    run.text = run.text.replace(find_text, replace_text)
-                                    replacements += run.text.count(replace_text)
-        
-        if replacements > 0:
-            doc.save(filename)
-            return f"Replaced {replacements} occurrence(s) of '{find_text}' with '{replace_text}'"
-        else:
-            return f"No occurrences of '{find_text}' found"
-    except Exception as e:
-        return f"Error replacing text: {str(e)}"
+    Args:
+        filename: Path to the Word document
+        mapping: Texts to search for, each mapped to its replacement
+    
+    Returns:
+        Number of replacements made or error message
+    """
+    return await asyncio.to_thread(word_ops.replace_text_many, filename, mapping)
+
+@mcp.tool()
+async def bulk_edit(filename: str, actions: List[dict]) -> str:
+    """Apply several edits to a Word document in a single open/save cycle.
+    
+    Args:
+        filename: Path to the Word document (created if it does not exist)
+        actions: List of edits applied in order. Each is a dict with a "type" key:
+            {"type": "add_paragraph", "text": "..."}
+            {"type": "add_heading", "text": "...", "level": 1}
+            {"type": "replace", "find": "...", "replace": "..."}
+            {"type": "replace_many", "mapping": {"find": "replace", ...}}
+    
+    Returns:
+        JSON string summarising the result of each action
+    """
+    return await asyncio.to_thread(word_ops.bulk_edit, filename, actions)
 
-@ mcp.tool()
-def export_to_pdf(source_filename: str, target_filename: Optional[str] = None) -> str:
+@mcp.tool()
+async def export_to_pdf(source_filename: str, target_filename: Optional[str] = None) -> str:
     """Export a Word document to PDF format.
     
     Args:
@@ -299,51 +167,34 @@ def export_to_pdf(source_filename: str, target_filename: Optional[str] = None) -
         Success or error message
     
     Note:
-        Requires LibreOffice to be installed and available in PATH as 'soffice'
+        Requires LibreOffice to be installed and available in PATH as 'soffice'.
+        If unoserver is installed, a persistent LibreOffice instance is started on
+        first use and reused for later conversions.
     """
-    source_path = ensure_docx_extension(source_filename)
-    if not check_file_exists(source_path):
-        return f"Error: Source document '{source_path}' does not exist"
+    return await asyncio.to_thread(word_ops.export_to_pdf, source_filename, target_filename)
+
+@mcp.tool()
+async def export_to_pdf_batch(source_filenames: List[str], output_dir: str = ".") -> str:
+    """Export several Word documents to PDF in one go.
     
-    # Determine target path
-    if target_filename is None:
-        target_path = source_path.replace('.docx', '.pdf')
-    else:
-        target_path = target_filename
-        if not target_path.lower().endswith('.pdf'):
-            target_path += '.pdf'
+    If unoserver is installed, the documents are sent one at a time to the
+    persistent LibreOffice instance, which has no per-file startup cost.
+    Otherwise the batch is split into up to one shard per CPU and the shards
+    are converted in parallel, each as a single LibreOffice run, so the
+    startup cost is paid once per shard rather than once per file.
     
-    output_dir = os.path.dirname(target_path) or '.'
+    Args:
+        source_filenames: Paths to the source Word documents
+        output_dir: Directory for the PDF files (defaults to current directory)
     
-    try:
-        # Run LibreOffice conversion
-        cmd = [
-            'soffice',
-            '--headless',
-            '--convert-to', 'pdf',
-            source_path,
-            '--outdir', output_dir
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        if result.returncode != 0:
-            error_msg = result.stderr.strip() or result.stdout.strip()
-            return f"Conversion failed: {error_msg}"
-        
-        # Determine the converted filename (same base as source)
-        source_base = os.path.splitext(os.path.basename(source_path))[0]
-        converted_path = os.path.join(output_dir, f"{source_base}.pdf")
-        
-        # If target_path is different, rename the file
-        if converted_path != target_path:
-            if os.path.exists(target_path):
-                return f"Error: Target file '{target_path}' already exists"
-            os.rename(converted_path, target_path)
-        
-        return f"Document converted to PDF: '{target_path}'"
+    Returns:
+        JSON string with the conversion status of each document
     
-    except Exception as e:
-        return f"Error during PDF conversion: {str(e)}"
+    Note:
+        Requires LibreOffice to be installed and available in PATH as 'soffice'.
+        Each PDF is named after its source document.
+    """
+    return await asyncio.to_thread(word_ops.export_to_pdf_batch, source_filenames, output_dir)
 
 def main():
     """Main entry point for the server."""
@@ -351,9 +202,15 @@ def main():
     print("Available tools:")
     print("  READ: read_document, get_document_info, list_documents")
     print("  COPY: copy_document")
-    print("  WRITE: create_document, write_text, add_heading, replace_text, export_to_pdf")
+    print("  WRITE: create_document, write_text, add_heading, replace_text, replace_text_many, bulk_edit, export_to_pdf, export_to_pdf_batch")
     print()
     
+    try:
+        # Pay python-docx's first-use cost now rather than on the first tool call
+        word_ops.warm_up()
+    except Exception:
+        pass  # not fatal, the first tool call will just be slower
+    
     try:
         # Run with stdio transport (default for MCP)
         mcp.run(transport='stdio')
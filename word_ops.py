@@ -0,0 +1,1173 @@
+"""
+Word document operations behind the MCP server tools.
+Shared by word_mcp_server.py and the test script so each operation is implemented once.
+"""
+
+import os
+import re
+import json
+import math
+import time
+import atexit
+import shutil
+import socket
+import zipfile
+import queue
+import inspect
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from functools import lru_cache, wraps
+from io import BytesIO
+from itertools import chain
+from xml.sax.saxutils import escape as xml_escape, quoteattr
+from pathlib import Path
+from typing import Optional, List, Dict, Tuple
+from docx import Document
+from docx.oxml.coreprops import CT_CoreProperties
+from lxml import etree
+
+__all__ = [
+    "ensure_docx_extension",
+    "check_file_exists",
+    "read_document",
+    "get_document_info",
+    "list_documents",
+    "copy_document",
+    "create_document",
+    "write_text",
+    "add_heading",
+    "replace_text",
+    "replace_text_many",
+    "bulk_edit",
+    "export_to_pdf",
+    "export_to_pdf_batch",
+    "warm_up",
+]
+
+try:
+    import ahocorasick
+except ImportError:  # optional, replace_text_many falls back to a regex
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:  # optional, _to_json falls back to the json module
+    orjson = None
+
+def _to_json(data) -> str:
+    """Serialise a tool result as indented JSON, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(data, indent=2)
+
+@lru_cache(maxsize=256)
+def ensure_docx_extension(filename: str) -> str:
+    """Ensure filename has .docx extension."""
+    return filename if filename.endswith('.docx') else filename + '.docx'
+
+def check_file_exists(filename: str) -> bool:
+    """Check if file exists."""
+    return os.path.exists(filename)
+
+def _normalize_filename(*param_names: str):
+    """Decorator applying ensure_docx_extension to the named parameters on entry,
+    so operation bodies can use their filenames as-is.
+    """
+    def decorator(func):
+        positions = [list(inspect.signature(func).parameters).index(name) for name in param_names]
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            args = list(args)
+            for name, position in zip(param_names, positions):
+                if position < len(args):
+                    args[position] = ensure_docx_extension(args[position])
+                elif name in kwargs:
+                    kwargs[name] = ensure_docx_extension(kwargs[name])
+            return func(*args, **kwargs)
+        
+        return wrapper
+    return decorator
+
+@lru_cache(maxsize=32)
+def _cached_load(path: str, mtime_ns: int, size: int) -> Document:
+    """Parse a document; keyed on mtime and size so a changed file misses the cache."""
+    return Document(path)
+
+def _load_doc(filename: str) -> Document:
+    """Load a document for reading, reusing a cached parse if the file is unchanged.
+    
+    The returned Document is shared between callers and must not be modified.
+    """
+    path = os.path.abspath(filename)
+    st = os.stat(path)
+    return _cached_load(path, st.st_mtime_ns, st.st_size)
+
+# Tools run in worker threads, so writes to the same file are serialised
+_write_locks: Dict[str, threading.Lock] = {}
+_write_locks_guard = threading.Lock()
+
+def _write_lock(filename: str) -> threading.Lock:
+    """Get the lock guarding read-modify-write cycles on a file."""
+    # Keyed like _atomic_replace, so a symlink and its target share one lock
+    path = os.path.realpath(filename)
+    with _write_locks_guard:
+        return _write_locks.setdefault(path, threading.Lock())
+
+# Reusable buffers for serialising documents before they are written out.
+# Buffers are rewound rather than truncated on reuse, since truncating a
+# BytesIO to zero frees its storage; only the first tell() bytes are valid.
+_BUFFER_POOL_SIZE = 8
+_BUFFER_MAX_BYTES = 64 * 1024 * 1024  # larger buffers are dropped rather than kept
+_buffer_pool: "queue.LifoQueue[BytesIO]" = queue.LifoQueue(maxsize=_BUFFER_POOL_SIZE)
+
+def _get_buf() -> BytesIO:
+    """Take a buffer from the pool, or a new one if the pool is empty."""
+    try:
+        buf = _buffer_pool.get_nowait()
+    except queue.Empty:
+        return BytesIO()
+    buf.seek(0)
+    return buf
+
+def _put_buf(buf: BytesIO):
+    """Return a buffer to the pool, dropping it if the pool is full or it is too large."""
+    if buf.getbuffer().nbytes > _BUFFER_MAX_BYTES:
+        return
+    try:
+        _buffer_pool.put_nowait(buf)
+    except queue.Full:
+        pass
+
+@contextmanager
+def _atomic_replace(filename: str):
+    """Open a temporary file that atomically replaces filename when the block exits cleanly.
+    
+    Symlinks are resolved so the file they point to is replaced, not the link,
+    and an existing file's permissions carry over. The temporary file is
+    removed if the block fails.
+    """
+    path = os.path.realpath(filename)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            yield f
+        if os.path.exists(path):
+            shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _save(doc: Document, filename: str):
+    """Save a document through a pooled buffer and invalidate cached parses.
+    
+    The file is replaced atomically, so concurrent readers never see a
+    half-written document.
+    """
+    buf = _get_buf()
+    try:
+        doc.save(buf)
+        size = buf.tell()
+        with buf.getbuffer() as view, _atomic_replace(filename) as f:
+            f.write(view[:size])
+    finally:
+        _put_buf(buf)
+    _cached_load.cache_clear()
+
+def warm_up():
+    """Build and serialise a blank document so python-docx's first-use setup
+    (template parsing, part registry, zip writer) happens before the first tool call.
+    """
+    buf = _get_buf()
+    try:
+        Document().save(buf)
+    finally:
+        _put_buf(buf)
+
+# FAST XML READERS
+# Read-only operations can stream the document XML straight out of the .docx
+# zip instead of building the full python-docx object tree.
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+# Encoding named in an XML declaration
+_XML_ENCODING = re.compile(rb'^(?:\xef\xbb\xbf)?<\?xml[^>]*?encoding=["\']([^"\']+)["\']')
+
+# Text equivalents of run content elements, matching python-docx's Run.text
+_RUN_TEXT = {
+    _W + 'tab': '\t',
+    _W + 'ptab': '\t',
+    _W + 'cr': '\n',
+    _W + 'noBreakHyphen': '-',
+}
+
+# Runs contributing to paragraph text: direct children and runs inside hyperlinks
+_PARAGRAPH_RUNS = etree.XPath('w:r | w:hyperlink/w:r', namespaces={'w': _W[1:-1]})
+
+def _run_text(run) -> str:
+    """Text of a <w:r> element."""
+    parts = []
+    for child in run:
+        tag = child.tag
+        if tag == _W + 't':
+            parts.append(child.text or '')
+        elif tag == _W + 'br':
+            # Only line breaks map to text; page and column breaks are dropped
+            if child.get(_W + 'type', 'textWrapping') == 'textWrapping':
+                parts.append('\n')
+        elif tag in _RUN_TEXT:
+            parts.append(_RUN_TEXT[tag])
+    return ''.join(parts)
+
+def _iter_body_elements(filename: str):
+    """Stream the top-level <w:p> and <w:tbl> elements of a document's body.
+    
+    Each element is cleared once the caller moves on, so memory stays flat
+    regardless of document size.
+    """
+    body = _W + 'body'
+    with zipfile.ZipFile(filename) as z, z.open('word/document.xml') as f:
+        # Like python-docx's parser, never expand entities from the (untrusted) document
+        for _, elem in etree.iterparse(f, events=('end',), tag=(_W + 'p', _W + 'tbl'),
+                                         resolve_entities=False, no_network=True):
+            parent = elem.getparent()
+            if parent is None or parent.tag != body:
+                # Nested paragraphs (table cells etc.) are cleared with their top-level ancestor
+                continue
+            yield elem
+            # Drop the parsed element and already-processed siblings
+            elem.clear()
+            while elem.getprevious() is not None:
+                del parent[0]
+
+def _fast_read_text(filename: str) -> str:
+    """Extract the text of the body paragraphs by streaming word/document.xml.
+    
+    Produces the same output as joining the non-empty paragraph.text values of
+    doc.paragraphs, without constructing a Document.
+    """
+    text_content = []
+    for elem in _iter_body_elements(filename):
+        if elem.tag == _W + 'p':
+            text = ''.join(_run_text(r) for r in _PARAGRAPH_RUNS(elem))
+            if text.strip():  # Only add non-empty paragraphs
+                text_content.append(text)
+    return "\n".join(text_content)
+
+def _xml_parser() -> etree.XMLParser:
+    """Create a parser that, like python-docx's, never expands entities from the document.
+    
+    A new parser is made per call since lxml parsers must not be shared between threads.
+    """
+    return etree.XMLParser(resolve_entities=False, no_network=True)
+
+_CORE_NS = {
+    'dc': 'http://purl.org/dc/elements/1.1/',
+    'dcterms': 'http://purl.org/dc/terms/',
+}
+
+def _fast_core_properties(filename: str) -> dict:
+    """Read title, author, created and modified from docProps/core.xml.
+    
+    Dates are parsed the same way python-docx parses them, so the values
+    match doc.core_properties.
+    """
+    with zipfile.ZipFile(filename) as z, z.open('docProps/core.xml') as f:
+        root = etree.parse(f, _xml_parser()).getroot()
+    
+    def text_of(qname: str) -> str:
+        elem = root.find(qname, _CORE_NS)
+        return (elem.text or '') if elem is not None else ''
+    
+    def date_of(qname: str):
+        value = text_of(qname)
+        if not value:
+            return None
+        try:
+            return CT_CoreProperties._parse_W3CDTF_to_datetime(value)
+        except ValueError:
+            # invalid datetime strings are ignored, as in python-docx
+            return None
+    
+    return {
+        "title": text_of('dc:title'),
+        "author": text_of('dc:creator'),
+        "created": date_of('dcterms:created'),
+        "modified": date_of('dcterms:modified'),
+    }
+
+def _fast_document_info(filename: str) -> dict:
+    """Build get_document_info's metadata by streaming the XML parts."""
+    core = _fast_core_properties(filename)
+    
+    paragraph_count = 0
+    table_count = 0
+    for elem in _iter_body_elements(filename):
+        if elem.tag == _W + 'p':
+            paragraph_count += 1
+        else:
+            table_count += 1
+    
+    return {
+        "filename": filename,
+        "title": core["title"] or "Untitled",
+        "author": core["author"] or "Unknown",
+        "created": str(core["created"]) if core["created"] else "Unknown",
+        "modified": str(core["modified"]) if core["modified"] else "Unknown",
+        "paragraph_count": paragraph_count,
+        "table_count": table_count,
+        "file_size_kb": round(os.path.getsize(filename) / 1024, 2)
+    }
+
+# Declaration binding the "w" prefix that the byte-level helpers below rely on
+_W_NS_DECL = b'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+# Characters that can reach run text without appearing literally in the XML
+# (entity-escaped, or produced by elements such as <w:tab/> and <w:noBreakHyphen/>)
+_NON_LITERAL_CHARS = frozenset('&<>"\'\t\r\n-')
+
+# A <w:t> followed by anything but the end of its run: the run's text is joined
+# from several <w:t> elements (split by e.g. <w:softHyphen/> or <w:lastRenderedPageBreak/>)
+_SPLIT_RUN_TEXT = re.compile(rb'</w:t>\s*<(?!/w:r>)')
+
+def _may_contain_text(filename: str, texts) -> bool:
+    """Cheaply check whether any of texts could occur in the document's runs.
+    
+    Does a byte search of the uncompressed word/document.xml, without parsing.
+    It only answers False when every run's text is a single literal <w:t>
+    in the XML and none of texts appears there; in every other case it
+    answers True and a full search is needed.
+    """
+    try:
+        with zipfile.ZipFile(filename) as z:
+            document_xml = z.read('word/document.xml')
+    except Exception:
+        return True
+    
+    match = _XML_ENCODING.match(document_xml)
+    if (match and match.group(1).lower() not in (b'utf-8', b'utf8')) or b'&#' in document_xml:
+        # Other encodings or character references can hide a literal match
+        return True
+    if _W_NS_DECL not in document_xml or _SPLIT_RUN_TEXT.search(document_xml):
+        # Other prefixes, or run text joined from several <w:t>, can hide a literal match
+        return True
+    
+    for text in texts:
+        if _NON_LITERAL_CHARS.intersection(text) or text.encode('utf-8') in document_xml:
+            return True
+    return False
+
+# FAST XML APPEND
+# Appending a paragraph only touches the end of word/document.xml, so it is
+# spliced into the raw XML instead of loading and re-serialising the whole
+# document. Anything unexpected makes the caller fall back to python-docx.
+
+def _run_xml(text: str) -> str:
+    """Build the <w:r> that python-docx's add_run(text) produces."""
+    parts = ['<w:r>']
+    for piece in re.split(r'([\t\r\n])', text):
+        if piece == '\t':
+            parts.append('<w:tab/>')
+        elif piece in ('\r', '\n'):
+            parts.append('<w:br/>')
+        elif piece:
+            space = ' xml:space="preserve"' if len(piece.strip()) < len(piece) else ''
+            parts.append(f'<w:t{space}>{xml_escape(piece)}</w:t>')
+    parts.append('</w:r>')
+    return ''.join(parts)
+
+def _paragraph_style_id(z: zipfile.ZipFile, style_name: str) -> Optional[str]:
+    """Look up the id of a non-default paragraph style by its (lowercase) name."""
+    try:
+        root = etree.fromstring(z.read('word/styles.xml'), _xml_parser())
+    except KeyError:
+        return None
+    for style in root.iterfind(_W + 'style'):
+        name = style.find(_W + 'name')
+        if (style.get(_W + 'type') == 'paragraph' and name is not None
+                and name.get(_W + 'val') == style_name):
+            if style.get(_W + 'default') in ('1', 'true'):
+                return None
+            return style.get(_W + 'styleId')
+    return None
+
+def _splice_into_body(document_xml: bytes, paragraph_xml: bytes) -> Optional[bytes]:
+    """Insert a paragraph at the end of the body, before the body-level <w:sectPr>.
+    
+    Returns None if the XML doesn't have the expected shape.
+    """
+    match = _XML_ENCODING.match(document_xml)
+    if match and match.group(1).lower() not in (b'utf-8', b'utf8'):
+        return None
+    
+    root_start = document_xml.find(b'<w:document')
+    if root_start == -1 or _W_NS_DECL not in document_xml[root_start:document_xml.find(b'>', root_start)]:
+        return None
+    
+    body_end = document_xml.rfind(b'</w:body>')
+    if body_end == -1:
+        return None
+    
+    head = document_xml[:body_end].rstrip()
+    insert_at = body_end
+    if head.endswith(b'</w:sectPr>') or head.endswith(b'<w:sectPr/>'):
+        insert_at = head.rfind(b'<w:sectPr')
+        section = head[insert_at:]
+        # A tracked <w:sectPrChange> holds its own <w:sectPr>, which rfind lands on
+        # instead of the body-level one, so give up on anything but a plain <w:sectPr>
+        if (section[9:10] not in (b' ', b'>', b'/') or section.count(b'<w:sectPr') > 1
+                or b'sectPrChange' in section):
+            return None
+    
+    return document_xml[:insert_at] + paragraph_xml + document_xml[insert_at:]
+
+def _fast_append_paragraph(filename: str, text: str, style_name: Optional[str] = None) -> bool:
+    """Append a paragraph to an existing document by rewriting only word/document.xml.
+    
+    Produces the same paragraph as doc.add_paragraph(text, style). Other parts
+    are copied across unparsed and the new package replaces the file atomically.
+    The caller must hold the file's write lock and have checked that it exists.
+    
+    Args:
+        filename: Path to the Word document
+        text: Paragraph text
+        style_name: Internal (lowercase) paragraph style name, e.g. "heading 1"
+    
+    Returns:
+        True if the paragraph was appended, False if the caller should fall back to python-docx
+    """
+    try:
+        with zipfile.ZipFile(filename) as zin:
+            paragraph = ['<w:p>']
+            if style_name:
+                style_id = _paragraph_style_id(zin, style_name)
+                if style_id is None:
+                    return False
+                paragraph.append(f'<w:pPr><w:pStyle w:val={quoteattr(style_id)}/></w:pPr>')
+            if text:
+                paragraph.append(_run_xml(text))
+            paragraph.append('</w:p>')
+            paragraph_xml = ''.join(paragraph).encode('utf-8')
+            # Let lxml reject anything python-docx would refuse to write (e.g. control characters)
+            etree.fromstring(f'<w:root {_W_NS_DECL.decode()}>'.encode('utf-8') + paragraph_xml + b'</w:root>')
+            
+            document_xml = _splice_into_body(zin.read('word/document.xml'), paragraph_xml)
+            if document_xml is None:
+                return False
+        
+        # The source zip is closed again before the replace happens
+        with _atomic_replace(filename) as f, zipfile.ZipFile(filename) as zin, zipfile.ZipFile(f, 'w') as zout:
+            for info in zin.infolist():
+                data = document_xml if info.filename == 'word/document.xml' else zin.read(info)
+                zout.writestr(info, data)
+        
+        _cached_load.cache_clear()
+        return True
+    except Exception:
+        return False
+
+# EDIT HELPERS
+# These operate on an already-opened Document so several edits can share a
+# single open/save cycle (see bulk_edit).
+
+def _apply_paragraph(doc: Document, text: str) -> str:
+    """Append a paragraph to an open document."""
+    doc.add_paragraph(text)
+    return "Paragraph added"
+
+# Valid heading levels for add_heading
+_VALID_LEVELS = frozenset(range(1, 7))
+
+def _apply_heading(doc: Document, text: str, level: int = 1) -> str:
+    """Append a heading to an open document."""
+    if level not in _VALID_LEVELS:
+        raise ValueError("Heading level must be between 1 and 6")
+    doc.add_heading(text, level=level)
+    return f"Heading '{text}' (level {level}) added"
+
+def _walk_runs(paragraphs):
+    """Yield every run of the given paragraphs."""
+    for paragraph in paragraphs:
+        for run in paragraph.runs:
+            yield run
+
+def _iter_doc_runs(doc: Document):
+    """Yield the runs of body paragraphs and of paragraphs inside table cells."""
+    return chain(
+        _walk_runs(doc.paragraphs),
+        *(_walk_runs(cell.paragraphs)
+          for table in doc.tables for row in table.rows for cell in row.cells)
+    )
+
+def _apply_replace(doc: Document, find_text: str, replace_text: str) -> int:
+    """Find and replace text in an open document, returning the replacement count.
+    
+    Replacement happens run by run to preserve formatting, covering body
+    paragraphs and paragraphs inside table cells.
+    """
+    if not find_text:
+        raise ValueError("Search text must not be empty")
+    
+    pattern = re.compile(re.escape(find_text))
+    # Escape backslashes so the replacement is taken literally by subn
+    replacement = replace_text.replace('\\', '\\\\')
+    replacements = 0
+    
+    for run in _iter_doc_runs(doc):
+        new_text, count = pattern.subn(replacement, run.text)
+        if count:
+            run.text = new_text
+            replacements += count
+    
+    return replacements
+
+def _build_multi_replacer(mapping: dict):
+    """Build a function replacing every key of mapping in a string in one pass.
+    
+    Matches are non-overlapping and leftmost-longest. The returned function
+    gives (new_text, replacement_count). Uses an Aho-Corasick automaton when
+    pyahocorasick is installed, otherwise a single regex alternation.
+    """
+    mapping = {k: v for k, v in mapping.items() if k}
+    
+    if not mapping:
+        return lambda text: (text, 0)
+    
+    if ahocorasick is None:
+        # Longest keys first so the alternation prefers the longest match
+        pattern = re.compile("|".join(re.escape(k) for k in sorted(mapping, key=len, reverse=True)))
+        return lambda text: pattern.subn(lambda m: mapping[m.group()], text)
+    
+    automaton = ahocorasick.Automaton()
+    for key, value in mapping.items():
+        automaton.add_word(key, (len(key), value))
+    automaton.make_automaton()
+    
+    def replace(text: str):
+        matches = [(end - length + 1, -length, value) for end, (length, value) in automaton.iter(text)]
+        if not matches:
+            return text, 0
+        matches.sort()
+        
+        parts = []
+        position = 0
+        for start, negative_length, value in matches:
+            if start < position:
+                continue  # overlaps a match already taken
+            parts.append(text[position:start])
+            parts.append(value)
+            position = start - negative_length
+        parts.append(text[position:])
+        return "".join(parts), (len(parts) - 1) // 2
+    
+    return replace
+
+def _apply_replace_many(doc: Document, mapping: dict) -> int:
+    """Replace every key of mapping with its value in one walk over the runs.
+    
+    Returns the total number of replacements made.
+    """
+    replace = _build_multi_replacer(mapping)
+    replacements = 0
+    
+    for run in _iter_doc_runs(doc):
+        new_text, count = replace(run.text)
+        if count:
+            run.text = new_text
+            replacements += count
+    
+    return replacements
+
+def _do_paragraph(doc: Document, action: dict) -> dict:
+    """Bulk action handler for "add_paragraph"."""
+    return {"changed": True, "message": _apply_paragraph(doc, action["text"])}
+
+def _do_heading(doc: Document, action: dict) -> dict:
+    """Bulk action handler for "add_heading"."""
+    return {"changed": True, "message": _apply_heading(doc, action["text"], int(action.get("level", 1)))}
+
+def _do_replace(doc: Document, action: dict) -> dict:
+    """Bulk action handler for "replace"."""
+    count = _apply_replace(doc, action["find"], action["replace"])
+    return {"changed": count > 0, "replacements": count}
+
+def _do_replace_many(doc: Document, action: dict) -> dict:
+    """Bulk action handler for "replace_many"."""
+    count = _apply_replace_many(doc, action["mapping"])
+    return {"changed": count > 0, "replacements": count}
+
+def _fast_append_action(filename: str, action) -> Optional[dict]:
+    """Apply a lone add_paragraph or add_heading action with _fast_append_paragraph.
+    
+    Returns the action's outcome, or None if it has to go through python-docx.
+    """
+    if not isinstance(action, dict) or not isinstance(action.get("text"), str):
+        return None
+    text = action["text"]
+    if action.get("type") == "add_paragraph":
+        if _fast_append_paragraph(filename, text):
+            return {"message": "Paragraph added"}
+    elif action.get("type") == "add_heading":
+        level = action.get("level", 1)
+        if (isinstance(level, int) and level in _VALID_LEVELS
+                and _fast_append_paragraph(filename, text, f"heading {level}")):
+            return {"message": f"Heading '{text}' (level {level}) added"}
+    return None
+
+# Maps a bulk action "type" to its handler
+_ACTION_HANDLERS = {
+    "add_paragraph": _do_paragraph,
+    "add_heading": _do_heading,
+    "replace": _do_replace,
+    "replace_many": _do_replace_many,
+}
+
+def _run_actions(filename: str, actions: List[dict], append: bool = True) -> Tuple[List[dict], bool]:
+    """Apply actions to a document with a single load and a single save.
+    
+    The document is opened once (or created if missing, or when append is
+    False), every action is applied in order and the file is saved only if at
+    least one action changed it. Failing actions are reported and skipped.
+    
+    Returns:
+        The per-action results, and whether the file existed beforehand
+    """
+    with _write_lock(filename):
+        existed = check_file_exists(filename)
+        if append and existed and len(actions) == 1:
+            # A single append to an existing file doesn't need the whole document parsed
+            outcome = _fast_append_action(filename, actions[0])
+            if outcome is not None:
+                return [{"index": 0, "type": actions[0]["type"], "status": "ok", **outcome}], existed
+        
+        if append and existed:
+            doc = Document(filename)
+        else:
+            doc = Document()
+        
+        results = []
+        changed = False
+        for index, action in enumerate(actions):
+            if not isinstance(action, dict):
+                results.append({"index": index, "type": None, "status": "error",
+                                "message": "Action must be an object with a 'type' key"})
+                continue
+            action_type = action.get("type")
+            # Unhashable types (e.g. lists) can't be looked up, so only strings are tried
+            handler = _ACTION_HANDLERS.get(action_type) if isinstance(action_type, str) else None
+            if handler is None:
+                results.append({"index": index, "type": action_type, "status": "error",
+                                "message": f"Unknown action type '{action_type}'"})
+                continue
+            try:
+                outcome = handler(doc, action)
+            except KeyError as e:
+                results.append({"index": index, "type": action_type, "status": "error",
+                                "message": f"Missing field {e}"})
+                continue
+            except Exception as e:
+                results.append({"index": index, "type": action_type, "status": "error",
+                                "message": str(e)})
+                continue
+            if outcome.pop("changed"):
+                changed = True
+            results.append({"index": index, "type": action_type, "status": "ok", **outcome})
+        
+        if changed:
+            _save(doc, filename)
+    
+    return results, existed
+
+# PDF CONVERSION
+# When unoserver is installed, a single LibreOffice instance is kept running
+# and each export is sent to it with unoconvert, instead of paying the full
+# soffice startup on every call. Without it we run soffice once per export.
+
+_UNO_HOST = "127.0.0.1"
+_UNO_PORT = 2003         # unoserver XML-RPC port that unoconvert talks to
+_UNO_OFFICE_PORT = 2002  # UNO socket of the soffice instance owned by unoserver
+_UNO_STARTUP_TIMEOUT = 30
+
+_uno_server = None       # unoserver process started by us, if any
+_uno_unavailable = False # set once starting unoserver has failed, to avoid retrying on every call
+_uno_lock = threading.Lock()
+
+def _uno_server_listening() -> bool:
+    """Check whether something is accepting connections on the unoserver port."""
+    try:
+        with socket.create_connection((_UNO_HOST, _UNO_PORT), timeout=1):
+            return True
+    except OSError:
+        return False
+
+def _stop_uno_server():
+    """Terminate the unoserver process started by this server."""
+    global _uno_server
+    if _uno_server is not None and _uno_server.poll() is None:
+        _uno_server.terminate()
+        try:
+            _uno_server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            _uno_server.kill()
+    _uno_server = None
+
+atexit.register(_stop_uno_server)
+
+def _ensure_uno_server() -> bool:
+    """Make sure a unoserver is available, starting one on first use.
+    
+    Returns:
+        True if conversions can be sent with unoconvert, False to fall back to soffice
+    """
+    with _uno_lock:
+        return _start_uno_server()
+
+def _start_uno_server() -> bool:
+    """Body of _ensure_uno_server; must be called with _uno_lock held."""
+    global _uno_server, _uno_unavailable
+    if _uno_unavailable or not shutil.which('unoconvert'):
+        return False
+    if _uno_server is not None and _uno_server.poll() is None:
+        return True
+    if _uno_server_listening():
+        # Reuse a unoserver that is already running
+        return True
+    if not shutil.which('unoserver'):
+        _uno_unavailable = True
+        return False
+    
+    _uno_server = subprocess.Popen(
+        [
+            'unoserver',
+            '--interface', _UNO_HOST,
+            '--port', str(_UNO_PORT),
+            '--uno-port', str(_UNO_OFFICE_PORT)
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    
+    deadline = time.monotonic() + _UNO_STARTUP_TIMEOUT
+    while time.monotonic() < deadline and _uno_server.poll() is None:
+        if _uno_server_listening():
+            return True
+        time.sleep(0.25)
+    
+    _stop_uno_server()
+    _uno_unavailable = True
+    return False
+
+def _convert_with_unoserver(source_path: str, target_path: str) -> subprocess.CompletedProcess:
+    """Convert a document to PDF through the running unoserver."""
+    cmd = [
+        'unoconvert',
+        '--host', _UNO_HOST,
+        '--port', str(_UNO_PORT),
+        '--convert-to', 'pdf',
+        source_path,
+        target_path
+    ]
+    return subprocess.run(cmd, capture_output=True, text=True)
+
+def _convert_with_soffice(source_paths: List[str], output_dir: str,
+                          profile_dir: Optional[str] = None) -> subprocess.CompletedProcess:
+    """Convert documents to PDF with a single soffice run.
+    
+    Each output lands in output_dir as <source base>.pdf. Concurrent soffice
+    runs must each be given their own profile_dir, as LibreOffice instances
+    sharing a user profile hand work to each other instead of running.
+    """
+    cmd = ['soffice']
+    if profile_dir:
+        cmd.append(f"-env:UserInstallation={Path(profile_dir).as_uri()}")
+    cmd += [
+        '--headless',
+        '--convert-to', 'pdf',
+        *source_paths,
+        '--outdir', output_dir
+    ]
+    return subprocess.run(cmd, capture_output=True, text=True)
+
+def _convert_isolated(source_paths: List[str], output_dir: str) -> subprocess.CompletedProcess:
+    """Run one soffice conversion in a throwaway profile.
+    
+    Tools run concurrently, so every soffice run gets its own profile rather
+    than sharing the default one with other exports in flight.
+    """
+    profile_dir = tempfile.mkdtemp(prefix="word-mcp-soffice-")
+    try:
+        return _convert_with_soffice(source_paths, output_dir, profile_dir)
+    finally:
+        shutil.rmtree(profile_dir, ignore_errors=True)
+
+def _converted_pdf_path(source_path: str, output_dir: str) -> str:
+    """Path soffice writes the PDF for source_path to (same base as source)."""
+    source_base = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(output_dir, f"{source_base}.pdf")
+
+def _finalize_pdf(source_path: str, output_dir: str, target_path: str) -> Optional[str]:
+    """Check soffice produced the PDF for source_path and move it to target_path.
+    
+    Returns:
+        An error message, or None on success
+    """
+    converted_path = _converted_pdf_path(source_path, output_dir)
+    if not os.path.exists(converted_path):
+        return f"Error: No PDF was produced for '{source_path}'"
+    
+    # If target_path is different, rename the file
+    if os.path.abspath(converted_path) != os.path.abspath(target_path):
+        if os.path.exists(target_path):
+            return f"Error: Target file '{target_path}' already exists"
+        os.rename(converted_path, target_path)
+    
+    return None
+
+# READ OPERATIONS
+
+@_normalize_filename("filename")
+def read_document(filename: str) -> str:
+    """Read all text content from a Word document."""
+    if not check_file_exists(filename):
+        return f"Error: Document '{filename}' does not exist"
+    
+    try:
+        return _fast_read_text(filename)
+    except Exception:
+        # Fall back to python-docx for anything the streaming reader can't handle
+        pass
+    
+    try:
+        doc = _load_doc(filename)
+        text_content = []
+        
+        for paragraph in doc.paragraphs:
+            if paragraph.text.strip():  # Only add non-empty paragraphs
+                text_content.append(paragraph.text)
+        
+        return "\n".join(text_content)
+    except Exception as e:
+        return f"Error reading document: {str(e)}"
+
+@_normalize_filename("filename")
+def get_document_info(filename: str) -> str:
+    """Get basic information about a Word document."""
+    if not check_file_exists(filename):
+        return f"Error: Document '{filename}' does not exist"
+    
+    try:
+        return _to_json(_fast_document_info(filename))
+    except Exception:
+        # Fall back to python-docx for anything the streaming reader can't handle
+        pass
+    
+    try:
+        doc = _load_doc(filename)
+        
+        info = {
+            "filename": filename,
+            "title": doc.core_properties.title or "Untitled",
+            "author": doc.core_properties.author or "Unknown",
+            "created": str(doc.core_properties.created) if doc.core_properties.created else "Unknown",
+            "modified": str(doc.core_properties.modified) if doc.core_properties.modified else "Unknown",
+            "paragraph_count": len(doc.paragraphs),
+            "table_count": len(doc.tables),
+            "file_size_kb": round(os.path.getsize(filename) / 1024, 2)
+        }
+        
+        return _to_json(info)
+    except Exception as e:
+        return f"Error getting document info: {str(e)}"
+
+def list_documents(directory: str = ".") -> str:
+    """List all Word documents in a directory."""
+    try:
+        if not os.path.exists(directory):
+            return f"Error: Directory '{directory}' does not exist"
+        
+        # scandir entries cache their stat result, so sizes cost no extra syscall
+        with os.scandir(directory) as it:
+            docx_files = [e for e in it if e.name.endswith('.docx') and e.is_file()]
+        
+        if not docx_files:
+            return f"No Word documents found in '{directory}'"
+        
+        docx_files.sort(key=lambda e: e.name)
+        result = f"Found {len(docx_files)} Word documents in '{directory}':\n"
+        for entry in docx_files:
+            size_kb = round(entry.stat().st_size / 1024, 2)
+            result += f"  • {entry.name} ({size_kb} KB)\n"
+        
+        return result.strip()
+    except Exception as e:
+        return f"Error listing documents: {str(e)}"
+
+@_normalize_filename("source_filename", "target_filename")
+def copy_document(source_filename: str, target_filename: str) -> str:
+    """Copy a Word document to create a new version while preserving all formatting."""
+    if not check_file_exists(source_filename):
+        return f"Error: Source document '{source_filename}' does not exist"
+    
+    if check_file_exists(target_filename):
+        return f"Error: Target document '{target_filename}' already exists"
+    
+    if not zipfile.is_zipfile(source_filename):
+        return f"Error copying document: '{source_filename}' is not a valid Word document"
+    
+    try:
+        # A .docx is self-contained, so a byte-for-byte copy preserves all formatting, styles, etc.
+        shutil.copyfile(source_filename, target_filename)
+        
+        return f"Document copied successfully from '{source_filename}' to '{target_filename}'"
+    except Exception as e:
+        return f"Error copying document: {str(e)}"
+
+# WRITE OPERATIONS
+
+@_normalize_filename("filename")
+def create_document(filename: str, title: Optional[str] = None, author: Optional[str] = None) -> str:
+    """Create a new Word document."""
+    try:
+        doc = Document()
+        
+        # Set metadata if provided
+        if title:
+            doc.core_properties.title = title
+        if author:
+            doc.core_properties.author = author
+        
+        with _write_lock(filename):
+            _save(doc, filename)
+        return f"Document '{filename}' created successfully"
+    except Exception as e:
+        return f"Error creating document: {str(e)}"
+
+@_normalize_filename("filename")
+def write_text(filename: str, text: str, append: bool = True) -> str:
+    """Write text to a Word document."""
+    try:
+        results, existed = _run_actions(filename, [{"type": "add_paragraph", "text": text}], append=append)
+        result = results[0]
+        if result["status"] != "ok":
+            return f"Error writing to document: {result['message']}"
+        
+        action = "appended to" if append and existed else "written to"
+        return f"Text {action} '{filename}' successfully"
+    except Exception as e:
+        return f"Error writing to document: {str(e)}"
+
+@_normalize_filename("filename")
+def add_heading(filename: str, text: str, level: int = 1) -> str:
+    """Add a heading to a Word document."""
+    # Validate heading level
+    if level not in _VALID_LEVELS:
+        return "Error: Heading level must be between 1 and 6"
+    
+    try:
+        results, _ = _run_actions(filename, [{"type": "add_heading", "text": text, "level": level}])
+        result = results[0]
+        if result["status"] != "ok":
+            return f"Error adding heading: {result['message']}"
+        
+        return f"Heading '{text}' (level {level}) added to '{filename}'"
+    except Exception as e:
+        return f"Error adding heading: {str(e)}"
+
+@_normalize_filename("filename")
+def replace_text(filename: str, find_text: str, replace_text: str) -> str:
+    """Find and replace text in a Word document."""
+    if not find_text:
+        return "Error: Search text must not be empty"
+    
+    if not check_file_exists(filename):
+        return f"Error: Document '{filename}' does not exist"
+    
+    try:
+        if not _may_contain_text(filename, [find_text]):
+            return f"No occurrences of '{find_text}' found"
+        
+        results, _ = _run_actions(filename, [{"type": "replace", "find": find_text, "replace": replace_text}])
+        result = results[0]
+        if result["status"] != "ok":
+            return f"Error replacing text: {result['message']}"
+        
+        replacements = result["replacements"]
+        if replacements > 0:
+            return f"Replaced {replacements} occurrence(s) of '{find_text}' with '{replace_text}'"
+        else:
+            return f"No occurrences of '{find_text}' found"
+    except Exception as e:
+        return f"Error replacing text: {str(e)}"
+
+@_normalize_filename("filename")
+def replace_text_many(filename: str, mapping: Dict[str, str]) -> str:
+    """Find and replace several texts in a Word document in a single pass."""
+    if not check_file_exists(filename):
+        return f"Error: Document '{filename}' does not exist"
+    
+    try:
+        # Empty keys are ignored by the replacer, so they aren't counted either
+        search_texts = [k for k in mapping if k]
+        if not _may_contain_text(filename, search_texts):
+            return "No occurrences of the search texts found"
+        
+        results, _ = _run_actions(filename, [{"type": "replace_many", "mapping": mapping}])
+        result = results[0]
+        if result["status"] != "ok":
+            return f"Error replacing text: {result['message']}"
+        
+        replacements = result["replacements"]
+        if replacements > 0:
+            return f"Replaced {replacements} occurrence(s) of {len(search_texts)} search text(s)"
+        else:
+            return "No occurrences of the search texts found"
+    except Exception as e:
+        return f"Error replacing text: {str(e)}"
+
+@_normalize_filename("filename")
+def bulk_edit(filename: str, actions: List[dict]) -> str:
+    """Apply several edits to a Word document in a single open/save cycle."""
+    try:
+        results, _ = _run_actions(filename, actions)
+        succeeded = sum(1 for r in results if r["status"] == "ok")
+        
+        summary = {
+            "filename": filename,
+            "applied": succeeded,
+            "failed": len(results) - succeeded,
+            "results": results
+        }
+        
+        return _to_json(summary)
+    except Exception as e:
+        return f"Error applying bulk edits: {str(e)}"
+
+@_normalize_filename("source_filename")
+def export_to_pdf(source_filename: str, target_filename: Optional[str] = None) -> str:
+    """Export a Word document to PDF format."""
+    source_path = source_filename
+    if not check_file_exists(source_path):
+        return f"Error: Source document '{source_path}' does not exist"
+    
+    # Determine target path
+    if target_filename is None:
+        target_path = source_path.replace('.docx', '.pdf')
+    else:
+        target_path = target_filename
+        if not target_path.lower().endswith('.pdf'):
+            target_path += '.pdf'
+    
+    output_dir = os.path.dirname(target_path) or '.'
+    
+    converted_path = _converted_pdf_path(source_path, output_dir)
+    
+    try:
+        if _ensure_uno_server():
+            # unoconvert writes straight to the target, so check for clashes up front
+            if os.path.abspath(converted_path) != os.path.abspath(target_path) and os.path.exists(target_path):
+                return f"Error: Target file '{target_path}' already exists"
+            
+            result = _convert_with_unoserver(source_path, target_path)
+            if result.returncode != 0:
+                error_msg = result.stderr.strip() or result.stdout.strip()
+                return f"Conversion failed: {error_msg}"
+            
+            return f"Document converted to PDF: '{target_path}'"
+        
+        # Run LibreOffice conversion
+        result = _convert_isolated([source_path], output_dir)
+        
+        if result.returncode != 0:
+            error_msg = result.stderr.strip() or result.stdout.strip()
+            return f"Conversion failed: {error_msg}"
+        
+        error = _finalize_pdf(source_path, output_dir, target_path)
+        if error:
+            return error
+        
+        return f"Document converted to PDF: '{target_path}'"
+    
+    except Exception as e:
+        return f"Error during PDF conversion: {str(e)}"
+
+def export_to_pdf_batch(source_filenames: List[str], output_dir: str = ".") -> str:
+    """Export several Word documents to PDF in one go."""
+    results = []
+    to_convert = []
+    seen_targets = set()
+    for source_filename in source_filenames:
+        source_path = ensure_docx_extension(source_filename)
+        target_path = _converted_pdf_path(source_path, output_dir)
+        if not check_file_exists(source_path):
+            results.append({"source": source_path, "status": "error",
+                            "message": f"Source document '{source_path}' does not exist"})
+        elif target_path in seen_targets:
+            results.append({"source": source_path, "status": "error",
+                            "message": f"Another document in the batch also converts to '{target_path}'"})
+        else:
+            seen_targets.add(target_path)
+            to_convert.append(source_path)
+            results.append({"source": source_path, "status": "pending", "pdf": target_path})
+    
+    try:
+        if to_convert:
+            if _ensure_uno_server():
+                for entry in results:
+                    if entry["status"] != "pending":
+                        continue
+                    result = _convert_with_unoserver(entry["source"], entry["pdf"])
+                    if result.returncode != 0:
+                        entry["status"] = "error"
+                        entry["message"] = result.stderr.strip() or result.stdout.strip()
+            else:
+                # Split the batch into one shard per worker; each shard is still a
+                # single soffice run so startup stays amortised across its files
+                max_workers = min(len(to_convert), os.cpu_count() or 1)
+                shard_size = math.ceil(len(to_convert) / max_workers)
+                shards = [to_convert[i:i + shard_size] for i in range(0, len(to_convert), shard_size)]
+                
+                failed = {}
+                if len(shards) == 1:
+                    result = _convert_isolated(shards[0], output_dir)
+                    if result.returncode != 0:
+                        failed.update(dict.fromkeys(shards[0], result.stderr.strip() or result.stdout.strip()))
+                else:
+                    # Threads are enough here: the conversion work happens in the soffice processes
+                    with ThreadPoolExecutor(max_workers=len(shards)) as pool:
+                        futures = {pool.submit(_convert_isolated, shard, output_dir): shard for shard in shards}
+                        for future in as_completed(futures):
+                            result = future.result()
+                            if result.returncode != 0:
+                                failed.update(dict.fromkeys(futures[future], result.stderr.strip() or result.stdout.strip()))
+                
+                for entry in results:
+                    if entry["source"] in failed:
+                        entry["status"] = "error"
+                        entry["message"] = f"Conversion failed: {failed[entry['source']]}"
+            
+            for entry in results:
+                if entry["status"] != "pending":
+                    continue
+                error = _finalize_pdf(entry["source"], output_dir, entry["pdf"])
+                if error:
+                    entry["status"] = "error"
+                    entry["message"] = error
+                else:
+                    entry["status"] = "ok"
+        
+        converted = sum(1 for r in results if r["status"] == "ok")
+        summary = {
+            "output_dir": output_dir,
+            "converted": converted,
+            "failed": len(results) - converted,
+            "results": results
+        }
+        
+        return _to_json(summary)
+    except Exception as e:
+        return f"Error during PDF conversion: {str(e)}"